@@ -347,6 +347,11 @@ def _add_logging_args(parser):
                        'flush to disk.')
     group.add_argument('--log-timers-to-tensorboard', action='store_true',
                        help='If set, write timers to tensorboard.')
+    group.add_argument('--timers-log-level', type=int, default=2,
+                       choices=[0, 1, 2],
+                       help='Console timer verbosity: 2 prints the timer '
+                       'table every log interval (default), lower levels '
+                       'skip it and keep only the one-line iteration log.')
     group.add_argument('--log-batch-size-to-tensorboard', action='store_true',
                        help='If set, write batch-size to tensorboard.')
     group.add_argument('--no-log-learnig-rate-to-tensorboard',
@@ -581,6 +586,12 @@ def _add_checkpointing_args(parser):
                        help='Do not save current optimizer.')
     group.add_argument('--no-save-rng', action='store_true', default=None,
                        help='Do not save current rng state.')
+    group.add_argument('--async-save', action='store_true',
+                       help='Write non-DeepSpeed checkpoints from a '
+                       'background thread so training overlaps the disk '
+                       'write. On an unclean exit the tracker file may '
+                       'point at a checkpoint whose shards from other '
+                       'ranks are still incomplete.')
     group.add_argument('--load', type=str, default=None,
                        help='Directory containing a model checkpoint.')
     group.add_argument('--no-load-optim', action='store_true', default=None,
@@ -735,6 +746,19 @@ def _add_data_args(parser):
                        help='Warm up mmap files.')
     group.add_argument('--num-workers', type=int, default=2,
                        help="Dataloader number of workers.")
+    group.add_argument('--dataloader-prefetch-factor', type=int, default=None,
+                       help='Batches loaded in advance by each dataloader '
+                       'worker; ignored (with a warning) when '
+                       '--num-workers is 0.')
+    group.add_argument('--dataloader-persistent-workers', action='store_true',
+                       help='Keep dataloader worker processes alive across '
+                       'epochs instead of respawning them. Requires '
+                       '--num-workers > 0.')
+    group.add_argument('--data-prefetch-depth', type=int, default=0,
+                       help='Number of batches to copy ahead to the '
+                       'accelerator on a side stream so host-to-device '
+                       'transfers overlap with compute. 0 disables '
+                       'prefetching.')
     group.add_argument('--tokenizer-type', type=str,
                        default=None,
                        choices=['BertWordPieceLowerCase',
@@ -15,9 +15,12 @@
 
 """Input/output checkpointing."""
 
+import concurrent.futures
+import copy
 import os
 import random
 import sys
+import threading
 import numpy as np
 from deepspeed.accelerator import get_accelerator
 import torch
@@ -32,6 +35,47 @@ from megatron import (get_args,
 
 _CHECKPOINT_VERSION = None
 
+# Single-worker executor used by --async-save so the blocking torch.save
+# runs off the training thread. A single worker keeps the writes (and the
+# tracker-file update chained behind them) strictly ordered.
+_SAVE_EXECUTOR = None
+_PENDING_SAVE_FUTURE = None
+
+
+def _get_save_executor():
+    global _SAVE_EXECUTOR
+    if _SAVE_EXECUTOR is None:
+        # The worker is not a daemon thread: Python joins it at
+        # interpreter exit, so a write still in flight when training
+        # ends is never truncated.
+        _SAVE_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='async-checkpoint')
+    return _SAVE_EXECUTOR
+
+
+def wait_for_pending_checkpoint():
+    """Block until the previous asynchronous checkpoint write, if any,
+    has finished, re-raising any error it hit."""
+    global _PENDING_SAVE_FUTURE
+    if _PENDING_SAVE_FUTURE is not None:
+        future = _PENDING_SAVE_FUTURE
+        _PENDING_SAVE_FUTURE = None
+        future.result()
+
+
+def _clone_state_dict_to_cpu(value):
+    """Detach a state dict from live device memory so training can keep
+    updating parameters while the background thread serializes it."""
+    if torch.is_tensor(value):
+        return value.detach().to('cpu', copy=True)
+    if isinstance(value, dict):
+        return {k: _clone_state_dict_to_cpu(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_clone_state_dict_to_cpu(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_clone_state_dict_to_cpu(v) for v in value)
+    return value
+
 def set_checkpoint_version(value):
     global _CHECKPOINT_VERSION
     if _CHECKPOINT_VERSION is not None:
@@ -108,6 +152,46 @@ def get_checkpoint_tracker_filename(checkpoints_path):
     training to restart from."""
     return os.path.join(checkpoints_path, 'latest_checkpointed_iteration.txt')
 
+def prefetch_checkpoint_files(load_dir):
+    """Warm the OS page cache for this rank's checkpoint shard.
+
+    Runs in a background thread so the sequential read overlaps with
+    model/optimizer construction; when load_checkpoint later calls
+    torch.load, it deserializes from memory instead of cold storage.
+    Best effort only: any failure is ignored and the real load path
+    reports errors as usual."""
+
+    def _warm():
+        try:
+            tracker_filename = get_checkpoint_tracker_filename(load_dir)
+            if not os.path.isfile(tracker_filename):
+                return
+            with open(tracker_filename, 'r') as f:
+                metastring = f.read().strip()
+            release = metastring == 'release'
+            iteration = 0 if release else int(metastring)
+            checkpoint_name = get_checkpoint_name(load_dir, iteration,
+                                                  release)
+            if not os.path.isfile(checkpoint_name):
+                return
+            with open(checkpoint_name, 'rb') as f:
+                try:
+                    os.posix_fadvise(f.fileno(), 0, 0,
+                                     os.POSIX_FADV_WILLNEED)
+                except (AttributeError, OSError):
+                    pass
+                # Stream through the file to pull it into the page cache.
+                while f.read(64 * 1024 * 1024):
+                    pass
+        except Exception:
+            pass
+
+    thread = threading.Thread(target=_warm, daemon=True,
+                              name='checkpoint-prefetch')
+    thread.start()
+    return thread
+
+
 @nvtx.annotate("Checkpointing", color="brown")
 def save_checkpoint(iteration, model, optimizer, lr_scheduler):
     """Save a model checkpoint."""
@@ -159,7 +243,21 @@ def save_checkpoint(iteration, model, optimizer, lr_scheduler):
         checkpoint_name = get_checkpoint_name(args.save, iteration)
         if not args.deepspeed:
             ensure_directory_exists(checkpoint_name)
-            torch.save(state_dict, checkpoint_name)
+            if args.async_save:
+                # Snapshot to host memory, then let the single-worker
+                # executor do the (slow) serialization and disk write
+                # while training continues. args must be snapshotted
+                # too: the training loop keeps bumping the consumed
+                # samples/tokens counters on the live Namespace, and
+                # load_checkpoint restores the counters from the
+                # pickled copy.
+                global _PENDING_SAVE_FUTURE
+                state_dict['args'] = copy.copy(args)
+                state_dict = _clone_state_dict_to_cpu(state_dict)
+                _PENDING_SAVE_FUTURE = _get_save_executor().submit(
+                    torch.save, state_dict, checkpoint_name)
+            else:
+                torch.save(state_dict, checkpoint_name)
 
     if args.deepspeed:
         #megatron model uses state_dict_for_save_checkpointing instead of the standard state_dict
@@ -188,9 +286,16 @@ def save_checkpoint(iteration, model, optimizer, lr_scheduler):
 
     # And update the latest iteration
     if is_rank_0():
-        tracker_filename = get_checkpoint_tracker_filename(args.save)
-        with open(tracker_filename, 'w') as f:
-            f.write(str(iteration))
+        def _update_tracker():
+            tracker_filename = get_checkpoint_tracker_filename(args.save)
+            with open(tracker_filename, 'w') as f:
+                f.write(str(iteration))
+        if args.async_save and not args.deepspeed:
+            # The single-worker executor runs tasks in order, so the
+            # tracker only advances after this rank's write lands.
+            _get_save_executor().submit(_update_tracker)
+        else:
+            _update_tracker()
 
     # Wait so everyone is done (not necessary)
     if torch.distributed.is_initialized():
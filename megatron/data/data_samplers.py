@@ -20,14 +20,19 @@ import torch
 import random
 from megatron import get_args
 from megatron import mpu
+from megatron import print_rank_0
+from deepspeed.accelerator import get_accelerator
 
 
-def build_pretraining_data_loader(dataset, consumed_samples):
+def build_pretraining_data_loader(dataset, consumed_samples,
+                                  num_workers=None):
     """Buld dataloader given an input dataset."""
 
     if dataset is None:
         return None
     args = get_args()
+    if num_workers is None:
+        num_workers = args.num_workers
 
     # Megatron sampler
     if args.dataloader_type == 'single':
@@ -48,11 +53,97 @@ def build_pretraining_data_loader(dataset, consumed_samples):
         raise Exception('{} dataloader type is not supported.'.format(
                 args.dataloader_type))
 
+    # Optional worker tuning. prefetch_factor/persistent_workers are
+    # only legal on multi-process loaders, so they are passed through
+    # kwargs rather than unconditionally.
+    loader_kwargs = {}
+    if args.dataloader_prefetch_factor is not None:
+        if num_workers == 0:
+            print_rank_0('WARNING: --dataloader-prefetch-factor is ignored '
+                         'when the loader has no workers.')
+        else:
+            loader_kwargs['prefetch_factor'] = args.dataloader_prefetch_factor
+    if args.dataloader_persistent_workers:
+        assert num_workers > 0, \
+            '--dataloader-persistent-workers requires workers'
+        loader_kwargs['persistent_workers'] = True
+
     # Torch dataloader.
     return torch.utils.data.DataLoader(dataset,
                                        batch_sampler=batch_sampler,
-                                       num_workers=args.num_workers,
-                                       pin_memory=True)
+                                       num_workers=num_workers,
+                                       pin_memory=True,
+                                       **loader_kwargs)
+
+class CudaPrefetcher:
+    """Iterator wrapper that copies upcoming batches to the accelerator
+    on a side stream.
+
+    Keeps `depth` batches in flight so the host-to-device transfer of
+    the next micro-batch overlaps with the compute of the current one
+    (the dataloader must use pin_memory=True for the copies to be truly
+    asynchronous). On __next__, the caller's current stream waits on the
+    copy event of the batch being handed out."""
+
+    def __init__(self, iterator, depth=2):
+        assert depth > 0
+        self.iterator = iterator
+        self.depth = depth
+        self.stream = get_accelerator().Stream()
+        self.ready = []
+
+    def __iter__(self):
+        return self
+
+    def _to_device(self, item):
+        if torch.is_tensor(item):
+            return item.to(get_accelerator().current_device_name(),
+                           non_blocking=True)
+        if isinstance(item, dict):
+            return {key: self._to_device(value)
+                    for key, value in item.items()}
+        if isinstance(item, (list, tuple)):
+            return type(item)(self._to_device(value) for value in item)
+        return item
+
+    def _record_stream(self, item, stream):
+        if torch.is_tensor(item):
+            item.record_stream(stream)
+        elif isinstance(item, dict):
+            for value in item.values():
+                self._record_stream(value, stream)
+        elif isinstance(item, (list, tuple)):
+            for value in item:
+                self._record_stream(value, stream)
+
+    def _prefetch(self):
+        try:
+            batch = next(self.iterator)
+        except StopIteration:
+            return False
+        with get_accelerator().stream(self.stream):
+            batch = self._to_device(batch)
+            event = get_accelerator().Event()
+            event.record()
+        self.ready.append((batch, event))
+        return True
+
+    def __next__(self):
+        while len(self.ready) < self.depth:
+            if not self._prefetch():
+                break
+        if not self.ready:
+            raise StopIteration
+        batch, event = self.ready.pop(0)
+        stream = get_accelerator().current_stream()
+        stream.wait_event(event)
+        # Mark the tensors as used by the consumer stream so the caching
+        # allocator cannot hand their blocks back to the side stream's
+        # pool (and let a later prefetch overwrite them) while kernels
+        # on this stream may still be reading the batch.
+        self._record_stream(batch, stream)
+        return batch
+
 
 class MegatronPretrainingSampler:
 
@@ -87,18 +178,33 @@ class MegatronPretrainingSampler:
         end_idx = start_idx + self.micro_batch_size
         return start_idx, end_idx
 
+    def state_dict(self):
+        """Sampler position, for checkpointing tools. The position is
+        fully described by the consumed-samples count the next
+        __iter__ resumes from."""
+        return {'consumed_samples': self.consumed_samples}
+
+    def load_state_dict(self, state_dict):
+        self.consumed_samples = state_dict['consumed_samples']
+
     def __iter__(self):
         batch = []
         # Last batch will be dropped if drop_last is not set False
         for idx in range(self.consumed_samples, self.total_samples):
             batch.append(idx)
             if len(batch) == self.micro_batch_times_data_parallel_size:
+                # Advance the position as batches are handed out, like
+                # the random sampler, so state_dict() taken mid-epoch
+                # reflects what was actually consumed.
+                self.consumed_samples += \
+                    self.micro_batch_times_data_parallel_size
                 start_idx, end_idx = self.get_start_end_idx()
                 yield batch[start_idx:end_idx]
                 batch = []
 
         # Check the last partial batch and see drop_last is set
         if len(batch) > 0 and not self.drop_last:
+            self.consumed_samples += len(batch)
             start_idx, end_idx = self.get_start_end_idx()
             yield batch[start_idx:end_idx]
 
@@ -130,6 +236,15 @@ class MegatronPretrainingRandomSampler:
     def __len__(self):
         return self.total_samples
 
+    def state_dict(self):
+        """Sampler position, for checkpointing tools. The epoch, shuffle
+        seed and in-epoch offset are all derived from the
+        consumed-samples count in __iter__."""
+        return {'consumed_samples': self.consumed_samples}
+
+    def load_state_dict(self, state_dict):
+        self.consumed_samples = state_dict['consumed_samples']
+
     def __iter__(self):
         active_total_samples = self.total_samples - self.last_batch_size
         self.epoch = self.consumed_samples // active_total_samples
@@ -144,8 +259,10 @@ class MegatronPretrainingRandomSampler:
         
         g = torch.Generator()
         g.manual_seed(self.epoch)
-        random_idx = torch.randperm(bucket_size, generator=g).tolist()
-        idx_range = [start_idx + x for x in random_idx[bucket_offset:]]
+        # Offset the permutation with a tensor add before the single
+        # host conversion instead of a Python loop over the epoch.
+        random_idx = torch.randperm(bucket_size, generator=g)
+        idx_range = (random_idx[bucket_offset:] + start_idx).tolist()
 
         batch = []
         # Last batch if not complete will be dropped.
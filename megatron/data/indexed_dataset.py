@@ -65,6 +65,14 @@ def make_dataset(path, impl, skip_warmup=False):
         return None
     if impl == 'infer':
         impl = infer_dataset_impl(path)
+    if impl in ('lazy', 'cached'):
+        # The legacy readers pull sample data into private process
+        # memory ('cached' copies the whole .bin per rank); mmap shards
+        # share one page-cache copy across all ranks and dataloader
+        # workers on a host.
+        print_rank_0("    WARNING: using the legacy '{}' dataset reader; "
+                     'mmap-format data avoids per-process copies of the '
+                     'dataset.'.format(impl))
     if impl == 'lazy' and IndexedDataset.exists(path):
         return IndexedDataset(path)
     elif impl == 'cached' and IndexedDataset.exists(path):
@@ -125,6 +125,50 @@ def rebuild_tokenizer(args):
     return _build_tokenizer(args)
 
 
+class _AsyncTensorboardWriter:
+    """Thin proxy that moves tensorboard writes off the training thread.
+
+    Each add_scalar/add_text call serializes a protobuf summary and can
+    block on disk I/O; at 30-50 scalars per logging step that is a
+    visible stall on the main thread. The proxy enqueues the calls on a
+    bounded queue drained by a daemon thread that owns the real
+    SummaryWriter; flush() joins the queue before flushing so callers
+    (e.g. checkpoint save, exit) can still force everything to disk."""
+
+    def __init__(self, writer):
+        import queue
+        import threading
+        self.writer_ = writer
+        self.queue_ = queue.Queue(maxsize=10000)
+        self.thread_ = threading.Thread(target=self._drain, daemon=True,
+                                        name='tensorboard-writer')
+        self.thread_.start()
+
+    def _drain(self):
+        while True:
+            method, call_args, call_kwargs = self.queue_.get()
+            try:
+                getattr(self.writer_, method)(*call_args, **call_kwargs)
+            except Exception as exc:
+                # Keep draining: if this thread died, later items would
+                # never get task_done and flush() would deadlock on
+                # queue_.join().
+                print('WARNING: tensorboard {} failed: {}'.format(
+                    method, exc), flush=True)
+            finally:
+                self.queue_.task_done()
+
+    def add_scalar(self, *args, **kwargs):
+        self.queue_.put(('add_scalar', args, kwargs))
+
+    def add_text(self, *args, **kwargs):
+        self.queue_.put(('add_text', args, kwargs))
+
+    def flush(self):
+        self.queue_.join()
+        self.writer_.flush()
+
+
 def _set_tensorboard_writer(args):
     """Set tensorboard writer."""
     global _GLOBAL_TENSORBOARD_WRITER
@@ -136,9 +180,10 @@ def _set_tensorboard_writer(args):
         try:
             from torch.utils.tensorboard import SummaryWriter
             print('> setting tensorboard ...')
-            _GLOBAL_TENSORBOARD_WRITER = SummaryWriter(
-                log_dir=args.tensorboard_dir,
-                max_queue=args.tensorboard_queue_size)
+            _GLOBAL_TENSORBOARD_WRITER = _AsyncTensorboardWriter(
+                SummaryWriter(
+                    log_dir=args.tensorboard_dir,
+                    max_queue=args.tensorboard_queue_size))
         except ModuleNotFoundError:
             print('WARNING: TensorBoard writing requested but is not '
                   'available (are you using PyTorch 1.1.0 or later?), '
@@ -225,17 +270,98 @@ class _Timer:
         return elapsed_
 
 
+class _CudaEventTimer:
+    """Timer based on accelerator events.
+
+    Unlike _Timer, start/stop only record events on the current stream
+    and never synchronize the device; the events are queried lazily when
+    elapsed() is called (i.e. at logging cadence). This keeps timing of
+    per-iteration phases from serializing GPU streams."""
+
+    def __init__(self, name):
+        self.name_ = name
+        self.elapsed_ = 0.0
+        self.started_ = False
+        self.event_pairs_ = []
+
+    def _record_event(self):
+        event = get_accelerator().Event(enable_timing=True)
+        event.record()
+        return event
+
+    def start(self):
+        """Start the timer."""
+        assert not self.started_, 'timer has already been started'
+        self.event_pairs_.append([self._record_event(), None])
+        self.started_ = True
+
+    def stop(self):
+        """Stop the timer."""
+        assert self.started_, 'timer is not started'
+        self.event_pairs_[-1][1] = self._record_event()
+        self.started_ = False
+
+    def reset(self):
+        """Reset timer."""
+        self.elapsed_ = 0.0
+        self.started_ = False
+        self.event_pairs_ = []
+
+    def elapsed(self, reset=True):
+        """Calculate the elapsed time."""
+        started_ = self.started_
+        # If the timing in progress, end it first.
+        if self.started_:
+            self.stop()
+        # Fold the recorded intervals into elapsed_. This is the only
+        # point where the device is synchronized.
+        get_accelerator().synchronize()
+        self.elapsed_ += sum(
+            start.elapsed_time(stop) / 1000.0
+            for start, stop in self.event_pairs_)
+        self.event_pairs_ = []
+        elapsed_ = self.elapsed_
+        # Reset the elapsed time
+        if reset:
+            self.reset()
+        # If timing was in progress, set it back.
+        if started_:
+            self.start()
+        return elapsed_
+
+
 class Timers:
     """Group of timers."""
 
     def __init__(self):
         self.timers = {}
 
-    def __call__(self, name):
+    def __call__(self, name, use_event=False):
         if name not in self.timers:
-            self.timers[name] = _Timer(name)
+            timer_cls = _CudaEventTimer if use_event else _Timer
+            self.timers[name] = timer_cls(name)
         return self.timers[name]
 
+    def transition(self, stop_name, start_name):
+        """Stop one event-based timer and start another off a single
+        shared event record.
+
+        For back-to-back phases this halves the number of events
+        recorded at the boundary while keeping both phases individually
+        reported."""
+        stop_timer = self(stop_name, use_event=True)
+        start_timer = self(start_name, use_event=True)
+        assert isinstance(stop_timer, _CudaEventTimer) and \
+            isinstance(start_timer, _CudaEventTimer), \
+            'transition only applies to event-based timers'
+        assert stop_timer.started_, 'timer is not started'
+        assert not start_timer.started_, 'timer has already been started'
+        event = stop_timer._record_event()
+        stop_timer.event_pairs_[-1][1] = event
+        stop_timer.started_ = False
+        start_timer.event_pairs_.append([event, None])
+        start_timer.started_ = True
+
     def write(self, names, writer, iteration, normalizer=1.0, reset=False):
         """Write timers to a tensorboard writer"""
         # currently when using add_scalars,
@@ -61,11 +61,12 @@ def set_tensor_model_parallel_attributes(tensor, is_parallel, dim, stride):
 
 
 def set_defaults_if_not_set_tensor_model_parallel_attributes(tensor):
-    def maybe_set(attribute, value):
-        if not hasattr(tensor, attribute):
-            setattr(tensor, attribute, value)
-    for attribute in _MODEL_PARALLEL_ATTRIBUTE_DEFAULTS:
-        maybe_set(attribute, _MODEL_PARALLEL_ATTRIBUTE_DEFAULTS[attribute])
+    # These flags live in the parameter's instance dict, so setdefault
+    # replaces a hasattr probe plus setattr per attribute. This runs for
+    # every parameter of the model at startup.
+    tensor_dict = tensor.__dict__
+    for attribute, value in _MODEL_PARALLEL_ATTRIBUTE_DEFAULTS.items():
+        tensor_dict.setdefault(attribute, value)
 
 
 def copy_tensor_model_parallel_attributes(destination_tensor, source_tensor):
@@ -53,8 +53,15 @@ def forward_step(forward_step_func, data_iterator, model, input_tensor, losses_r
     args = get_args()
 
     timers('forward-compute').start()
-    unwrapped_model = unwrap_model(
-        model, (torchDDP, LocalDDP, Float16Module))
+    # The wrapping structure is fixed after setup, so unwrap once per
+    # wrapper and cache the result instead of walking the hierarchy every
+    # microbatch. object.__setattr__ keeps the cached module out of
+    # nn.Module's submodule registry.
+    unwrapped_model = getattr(model, '_megatron_unwrapped', None)
+    if unwrapped_model is None:
+        unwrapped_model = unwrap_model(
+            model, (torchDDP, LocalDDP, Float16Module))
+        object.__setattr__(model, '_megatron_unwrapped', unwrapped_model)
     if not args.deepspeed:
         unwrapped_model.set_input_tensor(input_tensor)
     else:
@@ -135,6 +142,10 @@ def forward_backward_no_pipelining(forward_step_func, data_iterator, model,
 
     args = get_args()
 
+    # Suppress the per-backward gradient all-reduce on all but the last
+    # microbatch; only the final backward below (run outside this context)
+    # flushes the DDP buckets. LocalDDP needs no handler here since it
+    # batches grads itself via allreduce_gradients().
     context_handler = dummy_handler
     if isinstance(model, torchDDP):
         context_handler = model.no_sync
@@ -0,0 +1,25 @@
+# coding=utf-8
+# Copyright (c) 2020, NVIDIA CORPORATION.  All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Teacher-forward state for knowledge distillation.
+
+Kept in a ContextVar instead of on the global args namespace so the
+training step does not mutate shared state on its hot path and the flag
+stays correct for threaded or async callers."""
+
+from contextvars import ContextVar
+
+teacher_forward_enabled = ContextVar('teacher_forward_enabled',
+                                     default=False)
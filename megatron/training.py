@@ -15,15 +15,35 @@
 
 """Pretrain utilities."""
 
+from collections import namedtuple
+from contextlib import ContextDecorator, contextmanager
 from datetime import datetime
 import math
+import os
 import sys
 import time
 import json
 # The earliest we can measure the start time.
 _TRAIN_START_TIME = time.time()
 
-import nvtx
+if os.environ.get('NVTX_DISABLE') == '1':
+    # No-op stand-in for nvtx.annotate: profiling ranges add Python
+    # decorator overhead on every train_step call, so allow opting out.
+    import types
+
+    class _NoOpAnnotate(ContextDecorator):
+        def __init__(self, *unused_args, **unused_kwargs):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    nvtx = types.SimpleNamespace(annotate=_NoOpAnnotate)
+else:
+    import nvtx
 import torch
 from torch.nn.parallel.distributed import DistributedDataParallel as torchDDP
 
@@ -38,7 +58,9 @@ from megatron import mpu
 from megatron import print_rank_0
 from megatron import print_rank_last
 from megatron.checkpointing import load_checkpoint
+from megatron.checkpointing import prefetch_checkpoint_files
 from megatron.checkpointing import save_checkpoint
+from megatron.checkpointing import wait_for_pending_checkpoint
 from megatron.model import Float16Module
 from megatron.optimizer import get_megatron_optimizer
 from megatron.initialize import initialize_megatron
@@ -48,24 +70,112 @@ from megatron.model import DistributedDataParallel as LocalDDP
 from megatron.utils import check_adlr_autoresume_termination
 from megatron.utils import unwrap_model
 from megatron.data.data_samplers import build_pretraining_data_loader
+from megatron.data.data_samplers import CudaPrefetcher
+from megatron.teacher_state import teacher_forward_enabled
 from megatron.utils import calc_params_l2_norm
+from megatron.utils import finalize_params_l2_norm
 from megatron.schedules import forward_backward_no_pipelining
 from megatron.schedules import forward_backward_pipelining_without_interleaving
 from megatron.schedules import forward_backward_pipelining_with_interleaving
 from megatron.utils import report_memory, throughput_calculator, checkpoint_throughput_calculator
 from deepspeed.accelerator import get_accelerator
 import deepspeed
-from deepspeed.compression.compress import init_compression, redundancy_clean
+# Optional DeepSpeed features (compression, random-LTD) are imported
+# lazily in the branches that use them so plain runs do not pay for
+# pulling in those subpackages at import time.
+
+# Static configuration read by train_step on every call. None of these
+# values change over a run, so they are snapshotted once at the end of
+# setup_model_and_optimizer to keep repeated args/mpu lookups out of the
+# per-step dispatcher.
+_StepCtx = namedtuple('_StepCtx', [
+    'deepspeed', 'ds_pipeline_enabled', 'DDP_impl',
+    'use_contiguous_buffers_in_ddp', 'pp_world_size', 'vp_size',
+    'is_first_stage', 'is_last_stage', 'embedding_group',
+    'embed_grad_target', 'forward_backward_func'])
+_STEP_CTX = None
+
+
+def _build_step_ctx(args, model):
+    """Snapshot the static pieces of configuration used by train_step."""
+    pp_world_size = mpu.get_pipeline_model_parallel_world_size()
+    if pp_world_size > 1:
+        if args.virtual_pipeline_model_parallel_size is not None:
+            forward_backward_func = forward_backward_pipelining_with_interleaving
+        else:
+            forward_backward_func = forward_backward_pipelining_without_interleaving
+    else:
+        forward_backward_func = forward_backward_no_pipelining
+    is_first_stage = mpu.is_pipeline_first_stage(ignore_virtual=True)
+    is_last_stage = mpu.is_pipeline_last_stage(ignore_virtual=True)
+    # Only first/last stage ranks belong to an embedding group. Resolve
+    # the tied word-embedding weight here as well: whether this rank has
+    # to all-reduce its grad is fixed per run, so train_step should not
+    # re-unwrap the model every iteration to find out.
+    embedding_group = None
+    embed_grad_target = None
+    if pp_world_size > 1 and (is_first_stage or is_last_stage):
+        embedding_group = mpu.get_embedding_group()
+        if not args.deepspeed:
+            unwrapped_model = unwrap_model(
+                model[0] if is_first_stage else model[-1],
+                (torchDDP, LocalDDP, Float16Module))
+            if unwrapped_model.share_word_embeddings:
+                embed_grad_target = unwrapped_model.word_embeddings_weight()
+    return _StepCtx(
+        deepspeed=args.deepspeed,
+        ds_pipeline_enabled=args.ds_pipeline_enabled,
+        DDP_impl=args.DDP_impl,
+        use_contiguous_buffers_in_ddp=args.use_contiguous_buffers_in_ddp,
+        pp_world_size=pp_world_size,
+        vp_size=args.virtual_pipeline_model_parallel_size,
+        is_first_stage=is_first_stage,
+        is_last_stage=is_last_stage,
+        embedding_group=embedding_group,
+        embed_grad_target=embed_grad_target,
+        forward_backward_func=forward_backward_func)
+
+
+# Parsed DeepSpeed config, keyed by path. The same file is consulted by
+# pretrain and load_model_weights_only; parse it once per run.
+_DS_CONFIG_CACHE = {}
+
+
+def _load_ds_config(path):
+    """Load (and memoize) the DeepSpeed config JSON at `path`.
+
+    Callers that mutate the returned dict must copy it first."""
+    if path not in _DS_CONFIG_CACHE:
+        with open(path, 'r', encoding='utf-8') as fd:
+            _DS_CONFIG_CACHE[path] = json.load(fd)
+    return _DS_CONFIG_CACHE[path]
+
 
+# Process group for small CPU-side collectives (e.g. the start-time
+# reduction in pretrain) so the accelerator backend can stay cold until
+# the first forward pass. Built lazily since torch.distributed is only
+# initialized inside initialize_megatron.
+_GLOO_GROUP = None
+
+
+def _get_gloo_group():
+    global _GLOO_GROUP
+    if _GLOO_GROUP is None:
+        _GLOO_GROUP = torch.distributed.new_group(backend="gloo")
+    return _GLOO_GROUP
 
-from megatron.model.transformer import  ParallelTransformerLayer
-from deepspeed.runtime.data_pipeline.data_routing.helper import convert_to_random_ltd
 
 def print_datetime(string):
-    """Note that this call will sync across all ranks."""
-    torch.distributed.barrier()
+    """Print the current datetime from rank 0 only.
+
+    Informational log lines do not need a synchronized timestamp, so no
+    barrier is issued here; the surrounding initialization and checkpoint
+    calls already run their own collectives."""
+    if torch.distributed.is_initialized() and \
+       torch.distributed.get_rank() != 0:
+        return
     time_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    print_rank_0('[' + string + '] datetime: {} '.format(time_str))
+    print('[' + string + '] datetime: {} '.format(time_str), flush=True)
 
 
 def pretrain(train_valid_test_dataset_provider,
@@ -106,20 +216,23 @@ def pretrain(train_valid_test_dataset_provider,
     # This will be closer to what scheduler will see (outside of
     # image ... launches.
     global _TRAIN_START_TIME
-    start_time_tensor = get_accelerator().FloatTensor([_TRAIN_START_TIME])
-    torch.distributed.all_reduce(start_time_tensor,
-                                 op=torch.distributed.ReduceOp.MIN)
-    _TRAIN_START_TIME = start_time_tensor.item()
-    print_rank_0('time to initialize megatron (seconds): {:.3f}'.format(
-        time.time() - _TRAIN_START_TIME))
-    print_datetime('after megatron is initialized')
+    # Reduce on CPU over gloo: float64 keeps microsecond resolution on
+    # Unix timestamps and no device tensor/kernel is needed this early.
+    # The only consumer is a log line, so launch asynchronously and let
+    # the collective overlap with the config parsing below.
+    start_time_tensor = torch.tensor([_TRAIN_START_TIME],
+                                     dtype=torch.float64)
+    start_time_handle = torch.distributed.all_reduce(
+        start_time_tensor,
+        op=torch.distributed.ReduceOp.MIN,
+        group=_get_gloo_group(),
+        async_op=True)
 
     args = get_args()
     timers = get_timers()
 
     if args.deepspeed:
-        args.deepspeed_configuration = json.load(
-            open(args.deepspeed_config, 'r', encoding='utf-8'))
+        args.deepspeed_configuration = _load_ds_config(args.deepspeed_config)
         if "curriculum_learning" in args.deepspeed_configuration and \
             "enabled" in args.deepspeed_configuration["curriculum_learning"]:
             args.curriculum_learning_legacy = args.deepspeed_configuration[ \
@@ -132,6 +245,12 @@ def pretrain(train_valid_test_dataset_provider,
         if "compression_training" in args.deepspeed_configuration:
             args.compression_training = True
 
+    start_time_handle.wait()
+    _TRAIN_START_TIME = start_time_tensor.item()
+    print_rank_0('time to initialize megatron (seconds): {:.3f}'.format(
+        time.time() - _TRAIN_START_TIME))
+    print_datetime('after megatron is initialized')
+
     # Model, optimizer, and learning rate.
     timers('model-and-optimizer-setup').start()
     model, optimizer, lr_scheduler = setup_model_and_optimizer(
@@ -168,6 +287,19 @@ def pretrain(train_valid_test_dataset_provider,
                 args.deepspeed_dataloader = None
             else:
                 train_data_iterator = None
+        if args.data_prefetch_depth > 0 \
+                and args.virtual_pipeline_model_parallel_size is None:
+            # Double-buffer host-to-device copies on a side stream so they
+            # overlap with forward compute.
+            if train_data_iterator is not None:
+                train_data_iterator = CudaPrefetcher(
+                    train_data_iterator, depth=args.data_prefetch_depth)
+            if valid_data_iterator is not None:
+                valid_data_iterator = CudaPrefetcher(
+                    valid_data_iterator, depth=args.data_prefetch_depth)
+            if test_data_iterator is not None:
+                test_data_iterator = CudaPrefetcher(
+                    test_data_iterator, depth=args.data_prefetch_depth)
         timers('train/valid/test-data-iterators-setup').stop()
         print_datetime('after dataloaders are built')
 
@@ -200,6 +332,7 @@ def pretrain(train_valid_test_dataset_provider,
     
     # Clean the model and do evaluation again
     if args.compression_training:
+        from deepspeed.compression.compress import redundancy_clean
         model = [redundancy_clean(model[0], args.deepspeed_config, mpu)]
         if args.do_valid:
             prefix = 'the end of training and after model cleaning for val data'
@@ -219,6 +352,14 @@ def pretrain(train_valid_test_dataset_provider,
                                     test_data_iterator, model,
                                     0, True, test=True)
 
+    # Drain the async tensorboard queue before returning: the final
+    # eval scalars above would otherwise still be queued when the
+    # writer thread dies at interpreter exit.
+    writer = get_tensorboard_writer()
+    if writer:
+        writer.flush()
+
+
 def update_train_iters(args):
 
     # For iteration-based training, we don't need to do anything
@@ -249,32 +390,39 @@ def update_train_iters(args):
     print_rank_0('setting training iterations to {}'.format(args.train_iters))
 
 
-def setup_teacher_model(args, model_provider):        
-    
-    print_rank_0('***>>>>> Student model checkpoint iteration:{}'.format(args.iteration))
-    iteration_stuent = args.iteration
-    num_layers_student = args.num_layers
-    num_experts_student = args.num_experts
-    hidden_size_student = args.hidden_size
-    num_attention_heads_student = args.num_attention_heads
-    load_student = args.load
+@contextmanager
+def _override_args(args, **overrides):
+    """Temporarily override attributes on args.
+
+    The original values are restored on exit even if the body raises, so
+    a failed load does not leave args corrupted."""
+    saved = {key: getattr(args, key) for key in overrides}
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            setattr(args, key, value)
+
+
+def setup_teacher_model(args, model_provider):
 
+    print_rank_0('***>>>>> Student model checkpoint iteration:{}'.format(args.iteration))
     print_rank_0('***>>>>> Setting up the teacher model')
 
-    args.num_layers = args.num_layers_teacher
-    args.num_experts = args.num_experts_teacher
-    args.hidden_size = args.hidden_size_teacher
-    args.num_attention_heads = args.num_attention_heads_teacher
-    args.load = args.load_teacher
-    teacher_model, _, _ = load_model_weights_only(model_provider)
-    print_rank_0('***>>>>> Teacher model:{}'.format(teacher_model))
-
-    args.num_layers = num_layers_student
-    args.num_experts = num_experts_student
-    args.hidden_size = hidden_size_student
-    args.num_attention_heads = num_attention_heads_student
-    args.load = load_student
-    args.iteration = iteration_stuent
+    # The teacher hyperparameters are swapped into the global args only
+    # for the duration of the load. `iteration` is listed so the student
+    # value survives the checkpoint load in load_model_weights_only.
+    with _override_args(args,
+                        num_layers=args.num_layers_teacher,
+                        num_experts=args.num_experts_teacher,
+                        hidden_size=args.hidden_size_teacher,
+                        num_attention_heads=args.num_attention_heads_teacher,
+                        load=args.load_teacher,
+                        iteration=args.iteration):
+        teacher_model, _, _ = load_model_weights_only(model_provider)
+        print_rank_0('***>>>>> Teacher model:{}'.format(teacher_model))
 
     return teacher_model
 
@@ -312,18 +460,28 @@ def get_model(model_provider_func):
     # Only parameters that are already tensor model parallel have these
     # attributes set for them. We should make sure the default attributes
     # are set for all params so the optimizer can use them.
+    set_tp_attribute_defaults = \
+        mpu.set_defaults_if_not_set_tensor_model_parallel_attributes
     for model_module in model:
         for param in model_module.parameters():
-            mpu.set_defaults_if_not_set_tensor_model_parallel_attributes(param)
-
-    # Print number of parameters.
-    if mpu.get_data_parallel_rank() == 0:
+            set_tp_attribute_defaults(param)
+
+    # Print number of parameters. getattr with a default is cheaper than
+    # a hasattr probe per parameter; ds_numel is only present on ZeRO-3
+    # partitioned parameters. Tensor-parallel shards hold symmetric
+    # counts, so one line per pipeline stage is enough; line buffering
+    # makes an explicit flush unnecessary.
+    if mpu.get_data_parallel_rank() == 0 and \
+       mpu.get_tensor_model_parallel_rank() == 0:
+        num_parameters = sum(
+            getattr(p, 'ds_numel', None) or p.nelement()
+            for model_module in model
+            for p in model_module.parameters())
         print(' > number of parameters on (tensor, pipeline) '
               'model parallel rank ({}, {}): {}'.format(
             mpu.get_tensor_model_parallel_rank(),
             mpu.get_pipeline_model_parallel_rank(),
-            sum([sum([p.ds_numel if hasattr(p,'ds_id') else p.nelement() for p in model_module.parameters()])
-                 for model_module in model])), flush=True)
+            num_parameters))
 
     if args.deepspeed:
         return model
@@ -333,8 +491,14 @@ def get_model(model_provider_func):
         model_module.to(get_accelerator().current_device_name())
  
 
-    # Fp16 conversion.
+    # Fp16 conversion. Only the non-DeepSpeed path reaches this point
+    # (the deepspeed branch returned above): when DeepSpeed manages
+    # precision via its fp16/bf16 config, wrapping again would add a
+    # redundant Python cast hop on every forward, so assert the
+    # invariant instead of silently double-wrapping.
     if args.fp16 or args.bf16:
+        assert not args.deepspeed, \
+            'Float16Module must not wrap a DeepSpeed-managed model'
         model = [Float16Module(model_module, args) for model_module in model]
 
     if args.DDP_impl == 'torch':
@@ -408,8 +572,9 @@ def load_model_weights_only(model_provider_func):
     lr_scheduler = None
 
     if args.deepspeed:
-        with open(args.deepspeed_config, 'r') as fd:
-            ds_config = json.load(fd)
+        # Copy since the cached config is shared with pretrain and we
+        # drop the ZeRO section below.
+        ds_config = dict(_load_ds_config(args.deepspeed_config))
 
         # When loading just the model weights, ZeRO can be disabled.
         if 'zero_optimization' in ds_config:
@@ -441,6 +606,11 @@ def setup_model_and_optimizer(model_provider_func, teacher=False,
 
     model = get_model(model_provider_func)
 
+    # Start warming the page cache for this rank's checkpoint shard so
+    # the read overlaps with optimizer/DDP/DeepSpeed construction below.
+    if args.load is not None:
+        prefetch_checkpoint_files(args.load)
+
     # initialize the compression here
     student_global_steps = 0
     if args.kd or args.mos:
@@ -459,6 +629,7 @@ def setup_model_and_optimizer(model_provider_func, teacher=False,
 
 
     if args.compression_training:
+        from deepspeed.compression.compress import init_compression
         model, _, _, _ = deepspeed.initialize(
             model=model[0],
             args=args,
@@ -567,137 +738,363 @@ def setup_model_and_optimizer(model_provider_func, teacher=False,
 
     # random-LTD requires converting transformer layers
     if args.random_ltd:
+        from deepspeed.runtime.data_pipeline.data_routing.helper \
+            import convert_to_random_ltd
+        from megatron.model.transformer import ParallelTransformerLayer
         model[0] = convert_to_random_ltd(model[0], ParallelTransformerLayer)
 
+    # Bind the static step configuration now that parallel state and the
+    # wrapped model are final.
+    global _STEP_CTX
+    _STEP_CTX = _build_step_ctx(args, model)
+
     return model, optimizer, lr_scheduler
 
+# Candidate timer names reported by training_log. Which of these exist
+# depends on the schedule and optimizer in use, so the list is filtered
+# against the live timers at each logging call; the names themselves
+# never change.
+_TIMER_LOG_NAMES = (
+    'forward-compute',
+    'forward-recv',
+    'forward-send',
+    'forward-backward-send-forward-backward-recv',
+    'backward-compute',
+    'backward-recv',
+    'backward-send',
+    'backward-send-forward-recv',
+    'backward-send-backward-recv',
+    'backward-params-all-reduce',
+    'backward-embedding-all-reduce',
+    'optimizer-copy-to-main-grad',
+    'optimizer-unscale-and-check-inf',
+    'optimizer-clip-main-grad',
+    'optimizer-copy-main-to-model-params',
+    'optimizer',
+    'batch-generator',
+    'save-checkpoint',
+)
+
+
+# Flag-gated tensorboard scalars, resolved once on first logging call.
+_TB_SCALAR_SPECS = None
+
+
+def _get_tb_scalar_specs(args):
+    """(tag, getter, log_vs_tokens) triples for the flag-gated
+    tensorboard scalars.
+
+    The gating flags cannot change during a run, so the if/hasattr
+    chain is walked once here instead of on every logging iteration.
+    Scalars gated on per-step values (grad norm, num zeros, params
+    norm) remain inline in training_log."""
+    global _TB_SCALAR_SPECS
+    if _TB_SCALAR_SPECS is None:
+        specs = []
+        if args.log_learning_rate_to_tensorboard:
+            specs.append(('learning-rate/learning-rate',
+                          lambda a, v: v['learning_rate'], True))
+        if args.log_batch_size_to_tensorboard:
+            # Batch size has never been logged against tokens.
+            specs.append(('batch-size/batch-size',
+                          lambda a, v: v['batch_size'], False))
+        if args.log_loss_scale_to_tensorboard:
+            specs.append(('loss-scale/loss-scale',
+                          lambda a, v: v['loss_scale'], True))
+        if hasattr(args, 'actual_seq_length'):
+            specs.append(('seqlen/actual_seq_length',
+                          lambda a, v: a.actual_seq_length, True))
+        if args.curriculum_learning_legacy or \
+           args.data_efficiency_curriculum_learning:
+            specs.append(('seqlen/curriculum_seqlen',
+                          lambda a, v: a.curriculum_seqlen, True))
+        if args.random_ltd:
+            specs.append(('seqlen/random_ltd_reserved_length',
+                          lambda a, v: a.random_ltd_reserved_length, True))
+        _TB_SCALAR_SPECS = specs
+    return _TB_SCALAR_SPECS
+
+
+# Process groups the optimizer-state statistics must be reduced over.
+# Invariant across iterations, so resolved once on first use.
+_OPT_STATS_REDUCE_GROUPS = None
+
+
+def _get_opt_stats_reduce_groups(args):
+    global _OPT_STATS_REDUCE_GROUPS
+    if _OPT_STATS_REDUCE_GROUPS is None:
+        groups = []
+        if args.zero_stage > 0:
+            # ZeRO partiions optimizer states
+            groups.append(mpu.get_data_parallel_group())
+        if args.tensor_model_parallel_size > 1:
+            groups.append(mpu.get_tensor_model_parallel_group())
+        if args.pipeline_model_parallel_size > 1:
+            groups.append(mpu.get_pipeline_model_parallel_group())
+        _OPT_STATS_REDUCE_GROUPS = groups
+    return _OPT_STATS_REDUCE_GROUPS
+
+
+# Cached per-step sample increment. It only changes when the number of
+# microbatches does, i.e. at batch-size rampup boundaries, so keying on
+# that value reduces the per-step cost to one comparison.
+_INCREMENT_CACHE = {'num_microbatches': -1, 'value': 0}
+
+
+def _get_samples_increment(args):
+    """Number of samples consumed by one optimizer step."""
+    num_microbatches = get_num_microbatches()
+    if _INCREMENT_CACHE['num_microbatches'] != num_microbatches:
+        _INCREMENT_CACHE['num_microbatches'] = num_microbatches
+        _INCREMENT_CACHE['value'] = num_microbatches * \
+            args.micro_batch_size * args.data_parallel_size
+    return _INCREMENT_CACHE['value']
+
+
+def _average_losses_across_microbatches(losses_reduced):
+    """Average the per-microbatch loss dicts from a forward-backward pass.
+
+    Stacking once and taking a mean issues a single reduction kernel per
+    loss key instead of one add per microbatch, and detaching first keeps
+    the autograd graph from retaining microbatch activations across the
+    averaging. A single microbatch needs no averaging at all."""
+    if len(losses_reduced) == 1:
+        return losses_reduced[0]
+    loss_reduced = {}
+    for key in losses_reduced[0]:
+        loss_reduced[key] = torch.stack(
+            [x[key].detach() for x in losses_reduced]).mean()
+    return loss_reduced
+
+
 @nvtx.annotate("Train_step", color="green")
 def train_step(forward_step_func, data_iterator,
                model, optimizer, lr_scheduler):
     """Single training step."""
     args = get_args()
     timers = get_timers()
+    ctx = _STEP_CTX
 
-    if args.deepspeed and args.ds_pipeline_enabled:
+    if ctx.deepspeed and ctx.ds_pipeline_enabled:
         skipped_iter = 0
         num_zeros_in_grad = 0
         assert isinstance(model[0], deepspeed.PipelineEngine)
         loss = model[0].train_batch(data_iter=data_iterator)
         grad_norm = model[0].get_global_grad_norm()
+        if args.log_params_norm:
+            calc_params_l2_norm(model, async_op=True)
         return {'lm loss' : loss}, skipped_iter, grad_norm, num_zeros_in_grad
 
     # Set grad to zero.
-    if not args.deepspeed:
-        if args.DDP_impl == 'local' and args.use_contiguous_buffers_in_ddp:
+    if not ctx.deepspeed:
+        if ctx.DDP_impl == 'local' and ctx.use_contiguous_buffers_in_ddp:
             for partition in model:
                 partition.zero_grad_buffer()
         else:
             optimizer.zero_grad()
 
-    if mpu.get_pipeline_model_parallel_world_size() > 1:
-        if args.virtual_pipeline_model_parallel_size is not None:
-            forward_backward_func = forward_backward_pipelining_with_interleaving
-            assert get_num_microbatches() % args.pipeline_model_parallel_size == 0, \
-                'number of microbatches is not divisible by pipeline-parallel ' \
-                'size when using interleaved schedule'
-        else:
-            forward_backward_func = forward_backward_pipelining_without_interleaving
-    else:
-        forward_backward_func = forward_backward_no_pipelining
+    forward_backward_func = ctx.forward_backward_func
+    if ctx.vp_size is not None:
+        # Number of microbatches can change with batch size rampup, so
+        # this has to stay inside the step.
+        assert get_num_microbatches() % ctx.pp_world_size == 0, \
+            'number of microbatches is not divisible by pipeline-parallel ' \
+            'size when using interleaved schedule'
     if args.mos or args.kd:
-        # args.teacher_forward is used as global variable to enable kd loss
-        # calculation in forward pass. Users do not need to set it in the
-        # command line to use kd.
-        args.teacher_forward = True
-    losses_reduced = forward_backward_func(
-        forward_step_func, data_iterator, model,
-        optimizer, timers, forward_only=False)
-    if args.mos or args.kd:
-        args.teacher_forward = False
-
-    # All-reduce if needed.
-    if not args.deepspeed and args.DDP_impl == 'local':
-        timers('backward-params-all-reduce').start()
+        # teacher_forward_enabled tells the forward pass to add the kd
+        # loss. Users do not need to set anything on the command line to
+        # use kd beyond --mos/--kd themselves.
+        token = teacher_forward_enabled.set(True)
+        try:
+            losses_reduced = forward_backward_func(
+                forward_step_func, data_iterator, model,
+                optimizer, timers, forward_only=False)
+        finally:
+            teacher_forward_enabled.reset(token)
+    else:
+        losses_reduced = forward_backward_func(
+            forward_step_func, data_iterator, model,
+            optimizer, timers, forward_only=False)
+
+    # All-reduce if needed. The phase timers below run back to back, so
+    # transition() shares one event record per boundary instead of a
+    # stop/start pair.
+    if not ctx.deepspeed and ctx.DDP_impl == 'local':
+        timers('backward-params-all-reduce', use_event=True).start()
         for model_module in model:
             model_module.allreduce_gradients()
-        timers('backward-params-all-reduce').stop()
+        timers.transition('backward-params-all-reduce',
+                          'backward-embedding-all-reduce')
+    else:
+        timers('backward-embedding-all-reduce', use_event=True).start()
 
     # All-reduce word_embeddings' grad across first and last stages to ensure
     # that word_embeddings parameters stay in sync.
     # This should only run for models that support pipelined model parallelism
     # (BERT and GPT-2).
-    timers('backward-embedding-all-reduce').start()
-    if not args.deepspeed:
-        if (mpu.is_pipeline_first_stage(ignore_virtual=True) or
-            mpu.is_pipeline_last_stage(ignore_virtual=True)) and \
-                mpu.get_pipeline_model_parallel_world_size() > 1:
-            if mpu.is_pipeline_first_stage(ignore_virtual=True):
-                unwrapped_model = model[0]
-            elif mpu.is_pipeline_last_stage(ignore_virtual=True):
-                unwrapped_model = model[-1]
-            unwrapped_model = unwrap_model(
-                unwrapped_model, (torchDDP, LocalDDP, Float16Module))
-
-            if unwrapped_model.share_word_embeddings:
-                word_embeddings_weight = unwrapped_model.word_embeddings_weight()
-                if args.DDP_impl == 'local':
-                    grad = word_embeddings_weight.main_grad
-                else:
-                    grad = word_embeddings_weight.grad
-                torch.distributed.all_reduce(grad, group=mpu.get_embedding_group())
-    timers('backward-embedding-all-reduce').stop()
+    embedding_allreduce_handle = None
+    if ctx.embed_grad_target is not None:
+        if ctx.DDP_impl == 'local':
+            grad = ctx.embed_grad_target.main_grad
+        else:
+            grad = ctx.embed_grad_target.grad
+        # Launch asynchronously so this small collective can ride
+        # alongside the DDP bucket all-reduces instead of stalling
+        # the first/last stage; completion is enforced right
+        # before the optimizer consumes the gradient.
+        embedding_allreduce_handle = torch.distributed.all_reduce(
+            grad, group=ctx.embedding_group, async_op=True)
 
     # Update parameters.
-    timers('optimizer').start()
-    if args.deepspeed:
-        increment = get_num_microbatches() * \
-                    args.micro_batch_size * \
-                    args.data_parallel_size
+    timers.transition('backward-embedding-all-reduce', 'optimizer')
+    if embedding_allreduce_handle is not None:
+        embedding_allreduce_handle.wait()
+    if ctx.deepspeed:
+        increment = _get_samples_increment(args)
         model[0].step(lr_kwargs={'increment': increment})
         update_successful = model[0].was_step_applied()
     else:
         update_successful, grad_norm, num_zeros_in_grad = optimizer.step()
     timers('optimizer').stop()
 
+    # Launch the params-norm reduction right behind the step's own
+    # collectives so it overlaps with the scheduler and loss averaging
+    # below; train resolves it when logging.
+    if args.log_params_norm:
+        calc_params_l2_norm(model, async_op=True)
+
     # Update learning rate.
-    if args.deepspeed:
+    if ctx.deepspeed:
         skipped_iter = 0
         grad_norm = None
         num_zeros_in_grad = None
-        
-        loss_reduced = {}
-        for key in losses_reduced[0]:
-            losses_reduced_for_key = [x[key] for x in losses_reduced]
-            loss_reduced[key] = sum(losses_reduced_for_key) / len(losses_reduced_for_key)
+
+        loss_reduced = _average_losses_across_microbatches(losses_reduced)
         return loss_reduced, skipped_iter, grad_norm, num_zeros_in_grad
     else:
         if update_successful:
-            increment = get_num_microbatches() * \
-                        args.micro_batch_size * \
-                        args.data_parallel_size
+            increment = _get_samples_increment(args)
             lr_scheduler.step(increment=increment)
             skipped_iter = 0
         else:
             skipped_iter = 1
 
-        if mpu.is_pipeline_last_stage(ignore_virtual=True):
+        if ctx.is_last_stage:
             # Average loss across microbatches.
-            loss_reduced = {}
-            for key in losses_reduced[0]:
-                losses_reduced_for_key = [x[key] for x in losses_reduced]
-                loss_reduced[key] = sum(losses_reduced_for_key) / len(losses_reduced_for_key)
+            loss_reduced = _average_losses_across_microbatches(losses_reduced)
             return loss_reduced, skipped_iter, grad_norm, num_zeros_in_grad
     return {}, skipped_iter, grad_norm, num_zeros_in_grad
 
 
+@nvtx.annotate("Optimizer stats", color="orange")
+def _compute_and_log_opt_stats(optimizer, writer, iteration, args):
+    """Compute optimizer-state statistics and write them to
+    tensorboard.
+
+    Ranks that neither write to tensorboard nor feed one of the
+    cross-group reductions have nothing to contribute, so they skip
+    the parameter sweep entirely."""
+    if not _get_opt_stats_reduce_groups(args) and not is_last_rank():
+        return
+
+    # Accumulate every statistic on device; the only host
+    # transfer is the tolist() right before the scalars are
+    # written. The old per-parameter torch.norm(...).item()
+    # calls each forced a device-host sync.
+    device = get_accelerator().current_device_name()
+    opt_stats = torch.zeros(8, dtype=torch.float32, device=device)
+    opt_stats_2 = torch.zeros(4, dtype=torch.float32, device=device)
+    for group in optimizer.param_groups:
+        for param in group['params']:
+            state = optimizer.state[param]
+            exp_avg = state['exp_avg']
+            exp_avg_sq = state['exp_avg_sq']
+            # ||sqrt(v)||_2^2 == ||v||_1, so slots 1 and 4 share
+            # one kernel; max(sqrt(v)) == sqrt(max(v)) since
+            # sqrt is monotonic. The second moment is non-negative
+            # by construction, so the abs passes are dropped too.
+            # vector_norm hits the fused reduction kernels, so none
+            # of the pow/abs intermediates get materialized.
+            exp_avg_sq_l1 = exp_avg_sq.sum()
+            exp_avg_sq_abs_max = exp_avg_sq.max()
+            opt_stats[0] += torch.linalg.vector_norm(exp_avg_sq) ** 2
+            opt_stats[1] += exp_avg_sq_l1
+            opt_stats[2] += torch.linalg.vector_norm(exp_avg) ** 2
+            opt_stats[3] += torch.linalg.vector_norm(param) ** 2
+            opt_stats[4] += exp_avg_sq_l1
+            opt_stats[5] += exp_avg_sq.sqrt().sum()
+            opt_stats[6] += torch.linalg.vector_norm(exp_avg, ord=1)
+            opt_stats[7] += torch.linalg.vector_norm(param, ord=1)
+            opt_stats_2[0] = torch.maximum(opt_stats_2[0],
+                                           exp_avg_sq_abs_max)
+            opt_stats_2[1] = torch.maximum(opt_stats_2[1],
+                                           exp_avg_sq_abs_max.sqrt())
+            opt_stats_2[2] = torch.maximum(
+                opt_stats_2[2],
+                torch.linalg.vector_norm(exp_avg, ord=float('inf')))
+            opt_stats_2[3] = torch.maximum(
+                opt_stats_2[3],
+                torch.linalg.vector_norm(param, ord=float('inf')))
+    # The payloads are tiny, so launch latency dominates: fire
+    # the SUM and MAX reductions of each group together and wait
+    # on both handles at once. Groups still run sequentially
+    # because each reduces the previous group's result.
+    for reduce_group in _get_opt_stats_reduce_groups(args):
+        handles = [
+            torch.distributed.all_reduce(
+                opt_stats, group=reduce_group, async_op=True),
+            torch.distributed.all_reduce(
+                opt_stats_2, op=torch.distributed.ReduceOp.MAX,
+                group=reduce_group, async_op=True),
+        ]
+        for handle in handles:
+            handle.wait()
+
+    if writer and is_last_rank():
+        opt_stats = opt_stats.tolist()
+        opt_stats_2 = opt_stats_2.tolist()
+        writer.add_scalar('optimizer/variance_l2 vs tokens', opt_stats[0]**0.5, args.consumed_train_tokens)
+        writer.add_scalar('optimizer/variance_sqrt_l2 vs tokens', opt_stats[1]**0.5, args.consumed_train_tokens)
+        writer.add_scalar('optimizer/momentum_l2 vs tokens', opt_stats[2]**0.5, args.consumed_train_tokens)
+        writer.add_scalar('optimizer/weight_l2 vs tokens', opt_stats[3]**0.5, args.consumed_train_tokens)
+        writer.add_scalar('optimizer/variance_l1 vs tokens', opt_stats[4], args.consumed_train_tokens)
+        writer.add_scalar('optimizer/variance_sqrt_l1 vs tokens', opt_stats[5], args.consumed_train_tokens)
+        writer.add_scalar('optimizer/momentum_l1 vs tokens', opt_stats[6], args.consumed_train_tokens)
+        writer.add_scalar('optimizer/weight_l1 vs tokens', opt_stats[7], args.consumed_train_tokens)
+        writer.add_scalar('optimizer/variance_abs_max vs tokens', opt_stats_2[0], args.consumed_train_tokens)
+        writer.add_scalar('optimizer/variance_sqrt_abs_max vs tokens', opt_stats_2[1], args.consumed_train_tokens)
+        writer.add_scalar('optimizer/momentum_abs_max vs tokens', opt_stats_2[2], args.consumed_train_tokens)
+        writer.add_scalar('optimizer/weight_abs_max vs tokens', opt_stats_2[3], args.consumed_train_tokens)
+
+        writer.add_scalar('optimizer/variance_l2', opt_stats[0]**0.5, iteration)
+        writer.add_scalar('optimizer/variance_sqrt_l2', opt_stats[1]**0.5, iteration)
+        writer.add_scalar('optimizer/momentum_l2', opt_stats[2]**0.5, iteration)
+        writer.add_scalar('optimizer/weight_l2', opt_stats[3]**0.5, iteration)
+        writer.add_scalar('optimizer/variance_l1', opt_stats[4], iteration)
+        writer.add_scalar('optimizer/variance_sqrt_l1', opt_stats[5], iteration)
+        writer.add_scalar('optimizer/momentum_l1', opt_stats[6], iteration)
+        writer.add_scalar('optimizer/weight_l1', opt_stats[7], iteration)
+        writer.add_scalar('optimizer/variance_abs_max', opt_stats_2[0], iteration)
+        writer.add_scalar('optimizer/variance_sqrt_abs_max', opt_stats_2[1], iteration)
+        writer.add_scalar('optimizer/momentum_abs_max', opt_stats_2[2], iteration)
+        writer.add_scalar('optimizer/weight_abs_max', opt_stats_2[3], iteration)
+
+
+@nvtx.annotate("Training log", color="orange")
 def training_log(loss_dict, total_loss_dict, learning_rate, iteration,
                  loss_scale, report_memory_flag, skipped_iter,
                  grad_norm, params_norm, num_zeros_in_grad,
-                 model=None, optimizer=None):
+                 model=None, optimizer=None,
+                 args=None, timers=None, writer=None):
     """Log training information such as losses, timing, ...."""
-    args = get_args()
-    timers = get_timers()
-    writer = get_tensorboard_writer()
+    # Callers on the hot path (train) pass the handles in; fall back to
+    # the global lookups for everyone else.
+    if args is None:
+        args = get_args()
+    if timers is None:
+        timers = get_timers()
+    if writer is None:
+        writer = get_tensorboard_writer()
 
     # Advanced, skipped, and Nan iterations.
     advanced_iters_key = 'advanced iterations'
@@ -715,43 +1112,29 @@ def training_log(loss_dict, total_loss_dict, learning_rate, iteration,
         skipped_iters_key, 0) + skipped_iter
     # Update losses and set nan iterations
     got_nan = False
-    for key in loss_dict:
-        if not skipped_iter:
-            total_loss_dict[key] = total_loss_dict.get(
-                key, get_accelerator().FloatTensor([0.0])) + loss_dict[key]
-        else:
-            value = loss_dict[key].float().sum().item()
-            is_nan = value == float('inf') or \
-                     value == -float('inf') or \
-                     value != value
-            got_nan = got_nan or is_nan
+    if not skipped_iter:
+        for key in loss_dict:
+            accumulator = total_loss_dict.get(key)
+            if accumulator is None:
+                accumulator = get_accelerator().FloatTensor([0.0])
+                total_loss_dict[key] = accumulator
+            # In-place add of the detached loss: no fresh device tensor
+            # per key per iteration, and no autograd graph retained
+            # across iterations.
+            accumulator.add_(loss_dict[key].detach().float().sum())
+    elif loss_dict:
+        # One isfinite pass across all loss keys and a single host sync,
+        # instead of an .item() probe per key.
+        stacked_losses = torch.stack(
+            [loss_dict[key].float().sum() for key in loss_dict])
+        got_nan = bool((~torch.isfinite(stacked_losses)).any().item())
     total_loss_dict[nan_iters_key] = total_loss_dict.get(
         nan_iters_key, 0) + int(got_nan)
 
-    # Logging.
-    timers_to_log = []
-
-    def add_to_logging(name):
-        if name in timers.timers:
-            timers_to_log.append(name)
-    add_to_logging('forward-compute')
-    add_to_logging('forward-recv')
-    add_to_logging('forward-send')
-    add_to_logging('forward-backward-send-forward-backward-recv')
-    add_to_logging('backward-compute')
-    add_to_logging('backward-recv')
-    add_to_logging('backward-send')
-    add_to_logging('backward-send-forward-recv')
-    add_to_logging('backward-send-backward-recv')
-    add_to_logging('backward-params-all-reduce')
-    add_to_logging('backward-embedding-all-reduce')
-    add_to_logging('optimizer-copy-to-main-grad')
-    add_to_logging('optimizer-unscale-and-check-inf')
-    add_to_logging('optimizer-clip-main-grad')
-    add_to_logging('optimizer-copy-main-to-model-params')
-    add_to_logging('optimizer')
-    add_to_logging('batch-generator')
-    add_to_logging('save-checkpoint')
+    # Logging. Timers appear lazily (e.g. save-checkpoint after the
+    # first save), so filter the static name list against the live set.
+    timers_to_log = [name for name in _TIMER_LOG_NAMES
+                     if name in timers.timers]
 
     # Calculate batch size.
     batch_size = args.micro_batch_size * args.data_parallel_size * \
@@ -766,28 +1149,23 @@ def training_log(loss_dict, total_loss_dict, learning_rate, iteration,
         writer.add_scalar('steps-vs-samples/y=samples,x=steps', args.consumed_train_samples, iteration)
         writer.add_scalar('steps-vs-tokens/y=steps,x=tokens', iteration, args.consumed_train_tokens)
         writer.add_scalar('steps-vs-tokens/y=tokens,x=steps', args.consumed_train_tokens, iteration)
-        if args.log_learning_rate_to_tensorboard:
-            writer.add_scalar('learning-rate/learning-rate', learning_rate, iteration)
-            writer.add_scalar('learning-rate/learning-rate vs samples', learning_rate,
-                              args.consumed_train_samples)
-            writer.add_scalar('learning-rate/learning-rate vs tokens', learning_rate,
-                              args.consumed_train_tokens)
-        if args.log_batch_size_to_tensorboard:
-            writer.add_scalar('batch-size/batch-size', batch_size, iteration)
-            writer.add_scalar('batch-size/batch-size vs samples', batch_size,
+        scalar_values = {'learning_rate': learning_rate,
+                         'batch_size': batch_size,
+                         'loss_scale': loss_scale}
+        for tag, getter, log_vs_tokens in _get_tb_scalar_specs(args):
+            value = getter(args, scalar_values)
+            writer.add_scalar(tag, value, iteration)
+            writer.add_scalar(tag + ' vs samples', value,
                               args.consumed_train_samples)
+            if log_vs_tokens:
+                writer.add_scalar(tag + ' vs tokens', value,
+                                  args.consumed_train_tokens)
         for key in loss_dict:
             writer.add_scalar(f"lm-loss-training/{key}", loss_dict[key], iteration)
             writer.add_scalar(f"lm-loss-training/{key}" + ' vs samples', loss_dict[key],
                               args.consumed_train_samples)
             writer.add_scalar(f"lm-loss-training/{key}" + ' vs tokens', loss_dict[key],
                               args.consumed_train_tokens)
-        if args.log_loss_scale_to_tensorboard:
-            writer.add_scalar('loss-scale/loss-scale', loss_scale, iteration)
-            writer.add_scalar('loss-scale/loss-scale vs samples', loss_scale,
-                              args.consumed_train_samples)
-            writer.add_scalar('loss-scale/loss-scale vs tokens', loss_scale,
-                              args.consumed_train_tokens)
         if grad_norm is not None:
             writer.add_scalar('grad-norm/grad-norm', grad_norm, iteration)
             writer.add_scalar('grad-norm/grad-norm vs samples', grad_norm,
@@ -806,27 +1184,6 @@ def training_log(loss_dict, total_loss_dict, learning_rate, iteration,
                               args.consumed_train_samples)
             writer.add_scalar('params-norm/params-norm vs tokens', params_norm,
                               args.consumed_train_tokens)
-        if hasattr(args, 'actual_seq_length'):
-            writer.add_scalar('seqlen/actual_seq_length', args.actual_seq_length,
-                              iteration)
-            writer.add_scalar('seqlen/actual_seq_length vs samples', args.actual_seq_length,
-                              args.consumed_train_samples)
-            writer.add_scalar('seqlen/actual_seq_length vs tokens', args.actual_seq_length,
-                              args.consumed_train_tokens)
-        if args.curriculum_learning_legacy or args.data_efficiency_curriculum_learning:
-            writer.add_scalar('seqlen/curriculum_seqlen', args.curriculum_seqlen,
-                              iteration)
-            writer.add_scalar('seqlen/curriculum_seqlen vs samples', args.curriculum_seqlen,
-                              args.consumed_train_samples)
-            writer.add_scalar('seqlen/curriculum_seqlen vs tokens', args.curriculum_seqlen,
-                              args.consumed_train_tokens)
-        if args.random_ltd:
-            writer.add_scalar('seqlen/random_ltd_reserved_length', args.random_ltd_reserved_length,
-                              iteration)
-            writer.add_scalar('seqlen/random_ltd_reserved_length vs samples', args.random_ltd_reserved_length,
-                              args.consumed_train_samples)
-            writer.add_scalar('seqlen/random_ltd_reserved_length vs tokens', args.random_ltd_reserved_length,
-                              args.consumed_train_tokens)
         if args.log_timers_to_tensorboard:
             timers.write(timers_to_log, writer, iteration,
                          normalizer=total_iterations)
@@ -835,72 +1192,8 @@ def training_log(loss_dict, total_loss_dict, learning_rate, iteration,
         # This logging write various optimizer states to tensorboard. This
         # feature may consume extra GPU memory thus is set at false by default.
         if args.log_optimizer_states_to_tensorboard and optimizer is not None:
-            opt_stats = [0.0] * 8
-            opt_stats_2 = [0.0] * 4
-            for _, group in enumerate(optimizer.param_groups):
-                for _, param in enumerate(group['params']):
-                    opt_stats[0] += (torch.norm(optimizer.state[param]['exp_avg_sq']).item())**2
-                    opt_stats[1] += (torch.norm(optimizer.state[param]['exp_avg_sq'].sqrt()).item())**2
-                    opt_stats[2] += (torch.norm(optimizer.state[param]['exp_avg']).item())**2
-                    opt_stats[3] += (torch.norm(param).item())**2
-                    opt_stats[4] += torch.norm(optimizer.state[param]['exp_avg_sq'],p=1).item()
-                    opt_stats[5] += torch.norm(optimizer.state[param]['exp_avg_sq'].sqrt(),p=1).item()
-                    opt_stats[6] += torch.norm(optimizer.state[param]['exp_avg'],p=1).item()
-                    opt_stats[7] += torch.norm(param,p=1).item()
-                    opt_stats_2[0] = max(opt_stats_2[0], abs(optimizer.state[param]['exp_avg_sq'].max().item()), abs(optimizer.state[param]['exp_avg_sq'].min().item()))
-                    opt_stats_2[1] = max(opt_stats_2[1], optimizer.state[param]['exp_avg_sq'].sqrt().abs_().max().item())
-                    opt_stats_2[2] = max(opt_stats_2[2], abs(optimizer.state[param]['exp_avg'].max().item()), abs(optimizer.state[param]['exp_avg'].min().item()))
-                    opt_stats_2[3] = max(opt_stats_2[3], abs(param.max().item()), abs(param.min().item()))
-            # print('step {} rank {} before sync opt_stats {}, {}'.format(iteration, torch.distributed.get_rank(), opt_stats_2, opt_stats))
-            if args.zero_stage > 0:
-                # ZeRO partiions optimizer states
-                opt_stats = get_accelerator().FloatTensor(opt_stats)
-                torch.distributed.all_reduce(opt_stats, group=mpu.get_data_parallel_group())
-                opt_stats_2 = get_accelerator().FloatTensor(opt_stats_2)
-                torch.distributed.all_reduce(opt_stats_2, op=torch.distributed.ReduceOp.MAX,
-                    group=mpu.get_data_parallel_group())
-
-            if args.tensor_model_parallel_size > 1:
-                opt_stats = get_accelerator().FloatTensor(opt_stats)
-                torch.distributed.all_reduce(opt_stats, group=mpu.get_tensor_model_parallel_group())
-                opt_stats_2 = get_accelerator().FloatTensor(opt_stats_2)
-                torch.distributed.all_reduce(opt_stats_2, op=torch.distributed.ReduceOp.MAX,
-                    group=mpu.get_tensor_model_parallel_group())
-
-            if args.pipeline_model_parallel_size > 1:
-                opt_stats = get_accelerator().FloatTensor(opt_stats)
-                torch.distributed.all_reduce(opt_stats, group=mpu.get_pipeline_model_parallel_group())
-                opt_stats_2 = get_accelerator().FloatTensor(opt_stats_2)
-                torch.distributed.all_reduce(opt_stats_2, op=torch.distributed.ReduceOp.MAX,
-                    group=mpu.get_pipeline_model_parallel_group())
-
-            # print('step {} rank {} after sync opt_stats {}, {}'.format(iteration, torch.distributed.get_rank(), opt_stats_2, opt_stats))
-            if writer and is_last_rank():
-                writer.add_scalar('optimizer/variance_l2 vs tokens', opt_stats[0]**0.5, args.consumed_train_tokens)
-                writer.add_scalar('optimizer/variance_sqrt_l2 vs tokens', opt_stats[1]**0.5, args.consumed_train_tokens)
-                writer.add_scalar('optimizer/momentum_l2 vs tokens', opt_stats[2]**0.5, args.consumed_train_tokens)
-                writer.add_scalar('optimizer/weight_l2 vs tokens', opt_stats[3]**0.5, args.consumed_train_tokens)
-                writer.add_scalar('optimizer/variance_l1 vs tokens', opt_stats[4], args.consumed_train_tokens)
-                writer.add_scalar('optimizer/variance_sqrt_l1 vs tokens', opt_stats[5], args.consumed_train_tokens)
-                writer.add_scalar('optimizer/momentum_l1 vs tokens', opt_stats[6], args.consumed_train_tokens)
-                writer.add_scalar('optimizer/weight_l1 vs tokens', opt_stats[7], args.consumed_train_tokens)
-                writer.add_scalar('optimizer/variance_abs_max vs tokens', opt_stats_2[0], args.consumed_train_tokens)
-                writer.add_scalar('optimizer/variance_sqrt_abs_max vs tokens', opt_stats_2[1], args.consumed_train_tokens)
-                writer.add_scalar('optimizer/momentum_abs_max vs tokens', opt_stats_2[2], args.consumed_train_tokens)
-                writer.add_scalar('optimizer/weight_abs_max vs tokens', opt_stats_2[3], args.consumed_train_tokens)
-
-                writer.add_scalar('optimizer/variance_l2', opt_stats[0]**0.5, iteration)
-                writer.add_scalar('optimizer/variance_sqrt_l2', opt_stats[1]**0.5, iteration)
-                writer.add_scalar('optimizer/momentum_l2', opt_stats[2]**0.5, iteration)
-                writer.add_scalar('optimizer/weight_l2', opt_stats[3]**0.5, iteration)
-                writer.add_scalar('optimizer/variance_l1', opt_stats[4], iteration)
-                writer.add_scalar('optimizer/variance_sqrt_l1', opt_stats[5], iteration)
-                writer.add_scalar('optimizer/momentum_l1', opt_stats[6], iteration)
-                writer.add_scalar('optimizer/weight_l1', opt_stats[7], iteration)
-                writer.add_scalar('optimizer/variance_abs_max', opt_stats_2[0], iteration)
-                writer.add_scalar('optimizer/variance_sqrt_abs_max', opt_stats_2[1], iteration)
-                writer.add_scalar('optimizer/momentum_abs_max', opt_stats_2[2], iteration)
-                writer.add_scalar('optimizer/weight_abs_max', opt_stats_2[3], iteration)
+            _compute_and_log_opt_stats(optimizer, writer, iteration,
+                                       args)
 
     if iteration % args.log_interval == 0:
         elapsed_time = timers('interval-time').elapsed()
@@ -928,42 +1221,54 @@ def training_log(loss_dict, total_loss_dict, learning_rate, iteration,
                                   elapsed_time_per_iteration, args.consumed_train_samples)
                 writer.add_scalar('iteration-time/iteration-time vs tokens',
                                   elapsed_time_per_iteration, args.consumed_train_tokens)
-        log_string = ' iteration {:8d}/{:8d} |'.format(
-            iteration, args.train_iters)
-        log_string += ' consumed samples: {:12d} |'.format(
-            args.consumed_train_samples)
-        log_string += ' consumed tokens: {:12d} |'.format(
-            args.consumed_train_tokens)
-        log_string += ' elapsed time per iteration (ms): {:.1f} |'.format(
-            elapsed_time_per_iteration * 1000.0)
-        log_string += ' learning rate: {:.3E} |'.format(learning_rate)
-        log_string += ' global batch size: {:5d} |'.format(batch_size)
-        for key in total_loss_dict:
-            if key not in [advanced_iters_key, skipped_iters_key,
-                           nan_iters_key]:
-                avg = total_loss_dict[key].item() / \
-                      float(max(1, total_loss_dict[advanced_iters_key]))
+        # Collect the pieces and join once at the end rather than
+        # repeatedly reallocating a growing string.
+        log_parts = [
+            ' iteration {:8d}/{:8d} |'.format(iteration, args.train_iters),
+            ' consumed samples: {:12d} |'.format(
+                args.consumed_train_samples),
+            ' consumed tokens: {:12d} |'.format(
+                args.consumed_train_tokens),
+            ' elapsed time per iteration (ms): {:.1f} |'.format(
+                elapsed_time_per_iteration * 1000.0),
+            ' learning rate: {:.3E} |'.format(learning_rate),
+            ' global batch size: {:5d} |'.format(batch_size),
+        ]
+        loss_keys = [key for key in total_loss_dict
+                     if key not in (advanced_iters_key, skipped_iters_key,
+                                    nan_iters_key)]
+        if loss_keys:
+            # One device-host transfer for all accumulated losses instead
+            # of a sync per key; the accumulators are zeroed in place
+            # rather than reallocated.
+            loss_values = torch.stack(
+                [total_loss_dict[key].float().sum() for key in loss_keys]
+            ).cpu().tolist()
+            iters_normalizer = float(max(1, total_loss_dict[advanced_iters_key]))
+            for key, value in zip(loss_keys, loss_values):
+                avg = value / iters_normalizer
                 if avg > 0.0:
-                    log_string += ' {}: {:.6E} |'.format(key, avg)
-                total_loss_dict[key] = get_accelerator().FloatTensor([0.0])
-        log_string += ' loss scale: {:.1f} |'.format(loss_scale)
+                    log_parts.append(' {}: {:.6E} |'.format(key, avg))
+                total_loss_dict[key].zero_()
+        log_parts.append(' loss scale: {:.1f} |'.format(loss_scale))
         if grad_norm is not None:
-            log_string += ' grad norm: {:.3f} |'.format(grad_norm)
+            log_parts.append(' grad norm: {:.3f} |'.format(grad_norm))
         if num_zeros_in_grad is not None:
-            log_string += ' num zeros: {:.1f} |'.format(num_zeros_in_grad)
+            log_parts.append(' num zeros: {:.1f} |'.format(num_zeros_in_grad))
         if params_norm is not None:
-            log_string += ' params norm: {:.3f} |'.format(params_norm)
+            log_parts.append(' params norm: {:.3f} |'.format(params_norm))
         if args.curriculum_learning_legacy or args.data_efficiency_curriculum_learning:
-            log_string += ' curriculum seqlen: {:5d} |'.format(args.curriculum_seqlen)
+            log_parts.append(' curriculum seqlen: {:5d} |'.format(args.curriculum_seqlen))
         if args.random_ltd:
-            log_string += ' random ltd reserved length: {:5d} |'.format(args.random_ltd_reserved_length)
-        log_string += ' actual seqlen: {:5d} |'.format(seq_len)
-        log_string += ' number of skipped iterations: {:3d} |'.format(
-            total_loss_dict[skipped_iters_key])
-        log_string += ' number of nan iterations: {:3d} |'.format(
-            total_loss_dict[nan_iters_key])
-        log_string += ' samples per second: {:.3f} |'.format(samples_per_sec)
-        log_string += ' TFLOPs: {:.2f} |'.format(tflops)
+            log_parts.append(' random ltd reserved length: {:5d} |'.format(args.random_ltd_reserved_length))
+        log_parts.append(' actual seqlen: {:5d} |'.format(seq_len))
+        log_parts.append(' number of skipped iterations: {:3d} |'.format(
+            total_loss_dict[skipped_iters_key]))
+        log_parts.append(' number of nan iterations: {:3d} |'.format(
+            total_loss_dict[nan_iters_key]))
+        log_parts.append(' samples per second: {:.3f} |'.format(samples_per_sec))
+        log_parts.append(' TFLOPs: {:.2f} |'.format(tflops))
+        log_string = ''.join(log_parts)
         total_loss_dict[advanced_iters_key] = 0
         total_loss_dict[skipped_iters_key] = 0
         total_loss_dict[nan_iters_key] = 0
@@ -972,7 +1277,15 @@ def training_log(loss_dict, total_loss_dict, learning_rate, iteration,
             # Report memory after optimizer state has been initialized.
             report_memory('(after {} iterations)'.format(iteration))
             report_memory_flag = False
-        timers.log(timers_to_log, normalizer=args.log_interval)
+        if args.timers_log_level >= 2:
+            timers.log(timers_to_log, normalizer=args.log_interval)
+        else:
+            # Still fold and reset the timers: the event-based ones
+            # accumulate a CUDA event pair per phase per iteration
+            # until elapsed() collects them, so skipping the table must
+            # not skip the drain.
+            for name in timers_to_log:
+                timers.timers[name].elapsed()
 
 
     return report_memory_flag
@@ -980,15 +1293,24 @@ def training_log(loss_dict, total_loss_dict, learning_rate, iteration,
 @nvtx.annotate("Save checkpoint and time", color="brown")
 def save_checkpoint_and_time(iteration, model, optimizer, lr_scheduler):
     timers = get_timers()
-    # Extra barrier is added to make sure
-    # all ranks report the max time.
+    # Drain the previous asynchronous save, if any, so its error (or its
+    # write) cannot land in the middle of this one.
+    wait_for_pending_checkpoint()
+    # Barrier so all ranks enter the save together and the timer below
+    # reports the max time.
     torch.distributed.barrier()
     timers('save-checkpoint').start()
     save_checkpoint(iteration, model, optimizer, lr_scheduler)
-    torch.distributed.barrier()
+    # No trailing barrier: save_checkpoint already ends on one, and with
+    # --async-save the point is to return before the write lands.
     timers('save-checkpoint').stop()
     checkpoint_throughput_calculator(model, timers('save-checkpoint').elapsed(reset=False))
     timers.log(['save-checkpoint'])
+    # Force queued tensorboard writes to disk whenever a checkpoint is
+    # cut, so logs cannot trail the checkpoint on a crash.
+    writer = get_tensorboard_writer()
+    if writer:
+        writer.flush()
 
 
 def train(forward_step_func, model, optimizer, lr_scheduler,
@@ -996,6 +1318,7 @@ def train(forward_step_func, model, optimizer, lr_scheduler,
     """Train the model function."""
     args = get_args()
     timers = get_timers()
+    writer = get_tensorboard_writer()
 
     # Write args to tensorboard
     write_args_to_tensorboard()
@@ -1018,6 +1341,30 @@ def train(forward_step_func, model, optimizer, lr_scheduler,
     timers('interval-time').start()
     print_datetime('before the start of training step')
     report_memory_flag = True
+    # In-flight wall-clock-timeout reduction (see the exit check below).
+    exit_duration_flag = None
+    exit_duration_handle = None
+    # Last batch size pushed to the DeepSpeed engine (see below).
+    last_global_batch_size = -1
+
+    # Select the consumed-tokens update once: the curriculum flags are
+    # fixed for the run, so the common case reduces to one multiply per
+    # iteration without re-testing them.
+    if args.curriculum_learning_legacy or \
+       args.data_efficiency_curriculum_learning:
+        def _token_delta(new_samples):
+            # The numel attribute only appears once the data-efficiency
+            # curriculum starts publishing it, so probe per call.
+            if hasattr(args, 'data_efficiency_curriculum_learning_numel'):
+                act_mbsz = args.data_efficiency_curriculum_learning_numel / \
+                    args.curriculum_seqlen
+                act_token = act_mbsz * args.actual_seq_length
+                return mpu.get_data_parallel_world_size() * \
+                    get_num_microbatches() * act_token
+            return new_samples * args.actual_seq_length
+    else:
+        def _token_delta(new_samples):
+            return new_samples * args.actual_seq_length
     if args.random_ltd:
         assert model[0].random_ltd_enabled()
         args.random_ltd_layer_num = model[0].random_ltd_scheduler.get_random_ltd_layer_num()
@@ -1027,11 +1374,14 @@ def train(forward_step_func, model, optimizer, lr_scheduler,
         # with nvtx.annotate("Training", color="green"):
         update_num_microbatches(args.consumed_train_samples)
         if args.deepspeed:
-            # inform deepspeed of any batch size changes
+            # inform deepspeed of any batch size changes; the size only
+            # moves on rampup transitions, so skip the call otherwise.
             global_batch_size = mpu.get_data_parallel_world_size() * \
                                 args.micro_batch_size * \
                                 get_num_microbatches()
-            model[0].set_train_batch_size(global_batch_size)
+            if global_batch_size != last_global_batch_size:
+                model[0].set_train_batch_size(global_batch_size)
+                last_global_batch_size = global_batch_size
 
         if args.curriculum_learning_legacy and not args.no_pipeline_parallel:
             args.curriculum_seqlen = args.curriculum_scheduler.update_difficulty( \
@@ -1056,16 +1406,7 @@ def train(forward_step_func, model, optimizer, lr_scheduler,
             args.random_ltd_reserved_length = model[0].random_ltd_scheduler.get_current_seq()
             if args.random_ltd_reserved_length < args.actual_seq_length:
                 args.actual_seq_length = (args.actual_seq_length * (args.num_layers - args.random_ltd_layer_num) + args.random_ltd_reserved_length * args.random_ltd_layer_num) // args.num_layers
-        if args.curriculum_learning_legacy or args.data_efficiency_curriculum_learning:
-            if hasattr(args, 'data_efficiency_curriculum_learning_numel'):
-                act_mbsz = args.data_efficiency_curriculum_learning_numel / args.curriculum_seqlen
-                act_token = act_mbsz * args.actual_seq_length
-                args.consumed_train_tokens += mpu.get_data_parallel_world_size() * \
-                        get_num_microbatches() * act_token
-            else:
-                args.consumed_train_tokens += new_samples * args.actual_seq_length
-        else:
-            args.consumed_train_tokens += new_samples * args.actual_seq_length
+        args.consumed_train_tokens += _token_delta(new_samples)
         
         # Logging.
         if args.deepspeed:
@@ -1077,13 +1418,14 @@ def train(forward_step_func, model, optimizer, lr_scheduler,
             loss_scale = optimizer.get_loss_scale().item()
         params_norm = None
         if args.log_params_norm:
-            params_norm = calc_params_l2_norm(model)
+            params_norm = finalize_params_l2_norm()
         report_memory_flag = training_log(loss_dict, total_loss_dict,
                                         optimizer.param_groups[0]['lr'],
                                         iteration, loss_scale,
                                         report_memory_flag, skipped_iter,
                                         grad_norm, params_norm, num_zeros_in_grad,
-                                        model, optimizer)
+                                        model, optimizer,
+                                        args, timers, writer)
 
         # Autoresume
         if args.adlr_autoresume and \
@@ -1097,7 +1439,8 @@ def train(forward_step_func, model, optimizer, lr_scheduler,
             prefix = 'iteration {}'.format(iteration)
             evaluate_and_print_results(prefix, forward_step_func,
                                     valid_data_iterator, model,
-                                    iteration, False)
+                                    iteration, False,
+                                    args=args, writer=writer)
 
         # Checkpointing
         saved_checkpoint = False
@@ -1108,20 +1451,26 @@ def train(forward_step_func, model, optimizer, lr_scheduler,
                                         lr_scheduler)
                 saved_checkpoint = True
 
-        # Exiting based on duration
-        if args.exit_duration_in_mins:
+        # Exiting based on duration. The timeout only needs minute-level
+        # granularity, so the collective runs once per log interval and
+        # asynchronously: the reduction launched on the previous log
+        # iteration is resolved here before a new one is started.
+        if args.exit_duration_in_mins and \
+           iteration % args.log_interval == 0:
             train_time = (time.time() - _TRAIN_START_TIME) / 60.0
-            done_cuda = get_accelerator().IntTensor(
+            if exit_duration_handle is not None:
+                exit_duration_handle.wait()
+                if exit_duration_flag.item():
+                    if not saved_checkpoint:
+                        save_checkpoint_and_time(iteration, model, optimizer,
+                                                lr_scheduler)
+                    print_datetime('exiting program after {} minutes'.format(train_time))
+                    sys.exit()
+            exit_duration_flag = get_accelerator().IntTensor(
                 [train_time > args.exit_duration_in_mins])
-            torch.distributed.all_reduce(
-                done_cuda, op=torch.distributed.ReduceOp.MAX)
-            done = done_cuda.item()
-            if done:
-                if not saved_checkpoint:
-                    save_checkpoint_and_time(iteration, model, optimizer,
-                                            lr_scheduler)
-                print_datetime('exiting program after {} minutes'.format(train_time))
-                sys.exit()
+            exit_duration_handle = torch.distributed.all_reduce(
+                exit_duration_flag, op=torch.distributed.ReduceOp.MAX,
+                async_op=True)
 
         # Exiting based on iterations
         if args.exit_interval and iteration % args.exit_interval == 0:
@@ -1136,9 +1485,11 @@ def train(forward_step_func, model, optimizer, lr_scheduler,
     return iteration
 
 @nvtx.annotate("Evaluate compute", color="red")
-def evaluate(forward_step_func, data_iterator, model, verbose=False):
+def evaluate(forward_step_func, data_iterator, model, verbose=False,
+             args=None):
     """Evaluation."""
-    args = get_args()
+    if args is None:
+        args = get_args()
 
     # Turn on evaluation mode which disables dropout.
     for model_module in model:
@@ -1156,7 +1507,14 @@ def evaluate(forward_step_func, data_iterator, model, verbose=False):
 
     total_loss_dict = {}
 
-    with torch.no_grad():
+    # Under bf16 training the eval forward pass can run fully in
+    # bfloat16 autocast: no gradients are taken, so the higher-precision
+    # activations kept for training stability are not needed here.
+    autocast_ctx = torch.autocast(
+        device_type=get_accelerator().device_name(),
+        dtype=torch.bfloat16, enabled=bool(args.bf16))
+
+    with torch.no_grad(), autocast_ctx:
         iteration = 0
         while iteration < args.eval_iters:
             iteration += 1
@@ -1210,29 +1568,43 @@ def evaluate(forward_step_func, data_iterator, model, verbose=False):
     return total_loss_dict
 
 
+# Reused separator for the validation report below.
+_SEPARATOR_BAR = '-' * 256
+
+
 def evaluate_and_print_results(prefix, forward_step_func,
                                data_iterator, model,
-                               iteration, verbose=False, test=False):
+                               iteration, verbose=False, test=False,
+                               args=None, writer=None):
     """Helper function to evaluate and dump results on screen."""
-    args = get_args()
-    writer = get_tensorboard_writer()
-
-    total_loss_dict = evaluate(forward_step_func, data_iterator, model, verbose)
-    string = ' validation loss at {} | '.format(prefix)
-    for key in total_loss_dict:
-        string += '{} value: {:.6E} | '.format(key, total_loss_dict[key].item())
-        ppl = math.exp(min(20, total_loss_dict[key].item()))
-        string += '{} PPL: {:.6E} | '.format(key, ppl)
+    if args is None:
+        args = get_args()
+    if writer is None:
+        writer = get_tensorboard_writer()
+
+    total_loss_dict = evaluate(forward_step_func, data_iterator, model,
+                               verbose, args)
+    loss_keys = list(total_loss_dict)
+    # One device-to-host transfer for all reduced losses; the old code
+    # paid an .item() sync per scalar written.
+    loss_values = torch.stack(
+        [total_loss_dict[key].float().sum() for key in loss_keys]
+    ).cpu().tolist() if loss_keys else []
+    string_parts = [' validation loss at {} | '.format(prefix)]
+    for key, value in zip(loss_keys, loss_values):
+        string_parts.append('{} value: {:.6E} | '.format(key, value))
+        ppl = math.exp(min(20, value))
+        string_parts.append('{} PPL: {:.6E} | '.format(key, ppl))
         if writer and is_last_rank():
             data_type = 'test' if test else 'validation'
             writer.add_scalar(f'lm-loss-validation/{key} {data_type}',
-                              total_loss_dict[key].item(),
+                              value,
                               iteration)
             writer.add_scalar(f'lm-loss-validation/{key} {data_type} vs samples',
-                              total_loss_dict[key].item(),
+                              value,
                               args.consumed_train_samples)
             writer.add_scalar(f'lm-loss-validation/{key} {data_type} vs tokens',
-                              total_loss_dict[key].item(),
+                              value,
                               args.consumed_train_tokens)
             if args.log_validation_ppl_to_tensorboard:
                 writer.add_scalar(f'lm-loss-validation/{key} {data_type} ppl', ppl,
@@ -1241,17 +1613,40 @@ def evaluate_and_print_results(prefix, forward_step_func,
                                   ppl, args.consumed_train_samples)
                 writer.add_scalar(f'lm-loss-validation/{key} {data_type} ppl vs tokens',
                                   ppl, args.consumed_train_tokens)
+    string = ''.join(string_parts)
 
     length = len(string) + 1
-    print_rank_last('-' * length)
+    # Slice the preallocated bar instead of building two fresh dash
+    # strings per validation report.
+    bar = _SEPARATOR_BAR[:length] if length <= len(_SEPARATOR_BAR) \
+        else '-' * length
+    print_rank_last(bar)
     print_rank_last(string)
-    print_rank_last('-' * length)
+    print_rank_last(bar)
+
+
+class cyclic_iter:
+    """Endless pass over an iterable.
+
+    A plain class iterator instead of a generator: next() goes straight
+    through the C iterator protocol with no generator frame to resume
+    per batch, and the source is only re-iterated on exhaustion."""
 
+    __slots__ = ('_source', '_it')
 
-def cyclic_iter(iter):
-    while True:
-        for x in iter:
-            yield x
+    def __init__(self, source):
+        self._source = source
+        self._it = iter(source)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._it)
+        except StopIteration:
+            self._it = iter(self._source)
+            return next(self._it)
 
 def build_train_valid_test_data_iterators(
         build_train_valid_test_datasets_provider):
@@ -1260,6 +1655,11 @@ def build_train_valid_test_data_iterators(
 
     (train_dataloader, valid_dataloader, test_dataloader) = (None, None, None)
 
+    # Resolve the parallel-state lookups once for the whole build.
+    tp_rank = mpu.get_tensor_model_parallel_rank()
+    tp_src_rank = mpu.get_tensor_model_parallel_src_rank()
+    tp_group = mpu.get_tensor_model_parallel_group()
+
     print_rank_0('> building train, validation, and test datasets ...')
 
     # Backward compatibility, assume fixed batch size.
@@ -1274,7 +1674,7 @@ def build_train_valid_test_data_iterators(
             args.eval_iters * args.global_batch_size
 
     # Data loader only on rank 0 of each model parallel group.
-    if mpu.get_tensor_model_parallel_rank() == 0:
+    if tp_rank == 0:
 
         # Number of train/valid/test samples.
         if args.train_samples:
@@ -1287,21 +1687,26 @@ def build_train_valid_test_data_iterators(
         train_val_test_num_samples = [train_samples,
                                       eval_iters * args.global_batch_size,
                                       test_iters * args.global_batch_size]
-        print_rank_0(' > datasets target sizes (minimum size):')
-        print_rank_0('    train:      {}'.format(train_val_test_num_samples[0]))
-        print_rank_0('    validation: {}'.format(train_val_test_num_samples[1]))
-        print_rank_0('    test:       {}'.format(train_val_test_num_samples[2]))
+        print_rank_0(' > datasets target sizes (minimum size):\n'
+                     '    train:      {}\n'
+                     '    validation: {}\n'
+                     '    test:       {}'.format(*train_val_test_num_samples))
 
         # Build the datasets.
         train_ds, valid_ds, test_ds = build_train_valid_test_datasets_provider(
             train_val_test_num_samples)
 
-        # Build dataloders.
+        # Build dataloders. Valid/test run rarely, so their loaders get
+        # at most two workers to keep the total worker count (and the
+        # RAM the idle pools hold) bounded by the train loader.
+        eval_num_workers = min(args.num_workers, 2)
         train_dataloader = build_pretraining_data_loader(
             train_ds, args.consumed_train_samples)
         valid_dataloader = build_pretraining_data_loader(
-            valid_ds, args.consumed_valid_samples)
-        test_dataloader = build_pretraining_data_loader(test_ds, 0)
+            valid_ds, args.consumed_valid_samples,
+            num_workers=eval_num_workers)
+        test_dataloader = build_pretraining_data_loader(
+            test_ds, 0, num_workers=eval_num_workers)
 
         # Flags to know if we need to do training/validation/testing.
         do_train = train_dataloader is not None and args.train_iters > 0
@@ -1311,37 +1716,29 @@ def build_train_valid_test_data_iterators(
         flags = get_accelerator().LongTensor(
             [int(do_train), int(do_valid), int(do_test)])
     else:
-        flags = get_accelerator().LongTensor([0, 0, 0])
+        # Receiving ranks only need storage: torch.empty skips the
+        # list conversion and fill kernel of LongTensor([0, 0, 0]).
+        flags = torch.empty(3, dtype=torch.long,
+                            device=get_accelerator().current_device_name())
 
     # Broadcast num tokens.
-    torch.distributed.broadcast(flags,
-                                mpu.get_tensor_model_parallel_src_rank(),
-                                group=mpu.get_tensor_model_parallel_group())
-    args.do_train = flags[0].item()
-    args.do_valid = flags[1].item()
-    args.do_test = flags[2].item()
+    torch.distributed.broadcast(flags, tp_src_rank, group=tp_group)
+    # One host transfer for all three flags instead of an .item() sync
+    # apiece.
+    args.do_train, args.do_valid, args.do_test = flags.tolist()
 
 
-    # Build iterators.
+    # Build iterators. cyclic_iter is already an iterator, so no extra
+    # iter() layer is wrapped around it.
     dl_type = args.dataloader_type
     assert dl_type in ['single', 'cyclic']
 
-    if train_dataloader is not None:
-        train_data_iterator = iter(train_dataloader) if dl_type == 'single' \
-                              else iter(cyclic_iter(train_dataloader))
-    else:
-        train_data_iterator = None
-
-    if valid_dataloader is not None:
-        valid_data_iterator = iter(valid_dataloader) if dl_type == 'single' \
-                              else iter(cyclic_iter(valid_dataloader))
-    else:
-        valid_data_iterator = None
-
-    if test_dataloader is not None:
-        test_data_iterator = iter(test_dataloader) if dl_type == 'single' \
-                             else iter(cyclic_iter(test_dataloader))
-    else:
-        test_data_iterator = None
+    def _make_iterator(dataloader):
+        if dataloader is None:
+            return None
+        return iter(dataloader) if dl_type == 'single' \
+            else cyclic_iter(dataloader)
 
-    return train_data_iterator, valid_data_iterator, test_data_iterator
+    return (_make_iterator(train_dataloader),
+            _make_iterator(valid_dataloader),
+            _make_iterator(test_dataloader))
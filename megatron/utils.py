@@ -48,8 +48,17 @@ def unwrap_model(model, module_instances=(torchDDP)):
     return unwrapped_model
 
 
-def calc_params_l2_norm(model):
-    """Calculate l2 norm of parameters """
+# Params-norm reduction in flight, launched by calc_params_l2_norm with
+# async_op=True and resolved by finalize_params_l2_norm.
+_PENDING_PARAMS_NORM = None
+
+
+def calc_params_l2_norm(model, async_op=False):
+    """Calculate l2 norm of parameters.
+
+    With async_op=True the model-parallel reduction is only launched;
+    the caller gets the value later from finalize_params_l2_norm, so the
+    collective can overlap with whatever runs in between."""
     args = get_args()
     if not isinstance(model, list):
         model = [model]
@@ -79,9 +88,24 @@ def calc_params_l2_norm(model):
         norm = torch.norm(params_data,p=2.0)
     norm_2 = norm * norm
     # Sum across all model-parallel GPUs.
-    torch.distributed.all_reduce(norm_2,
-                                 op=torch.distributed.ReduceOp.SUM,
-                                 group=mpu.get_model_parallel_group())
+    handle = torch.distributed.all_reduce(norm_2,
+                                          op=torch.distributed.ReduceOp.SUM,
+                                          group=mpu.get_model_parallel_group(),
+                                          async_op=async_op)
+    if async_op:
+        global _PENDING_PARAMS_NORM
+        _PENDING_PARAMS_NORM = (norm_2, handle)
+        return None
+    return norm_2.item() ** 0.5
+
+
+def finalize_params_l2_norm():
+    """Resolve the reduction launched by calc_params_l2_norm with
+    async_op=True and return the norm as a float."""
+    global _PENDING_PARAMS_NORM
+    norm_2, handle = _PENDING_PARAMS_NORM
+    _PENDING_PARAMS_NORM = None
+    handle.wait()
     return norm_2.item() ** 0.5
 
 
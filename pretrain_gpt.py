@@ -25,6 +25,7 @@ from megatron import get_tokenizer
 from megatron import mpu
 from megatron.data.gpt_dataset import build_train_valid_test_datasets
 from megatron.model import GPTModel, GPTModelPipe
+from megatron.teacher_state import teacher_forward_enabled
 from megatron.training import pretrain
 from megatron.utils import get_ltor_masks_and_position_ids
 from megatron.utils import average_losses_across_data_parallel_group
@@ -270,7 +271,7 @@ def forward_step(data_iterator, model):
     mos_loss = 0
     if args.mos or args.kd:
         assert model.training
-        if args.teacher_forward and args.teacher_model is not None:
+        if teacher_forward_enabled.get() and args.teacher_model is not None:
             mos_loss = calculate_mos_loss(args, stu_output,
                 args.teacher_model[0], tokens, position_ids, attention_mask)
     
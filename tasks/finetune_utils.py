@@ -30,7 +30,7 @@ from megatron.training import setup_model_and_optimizer
 from megatron.training import train_step
 from megatron.training import training_log
 from megatron.utils import average_losses_across_data_parallel_group
-from megatron.utils import calc_params_l2_norm
+from megatron.utils import finalize_params_l2_norm
 from megatron.utils import check_adlr_autoresume_termination
 from deepspeed.accelerator import get_accelerator
 
@@ -236,7 +236,9 @@ def _train(model, optimizer, lr_scheduler, forward_step,
             # Logging.
             params_norm = None
             if args.log_params_norm:
-                params_norm = calc_params_l2_norm(model)
+                # train_step already launched the reduction; resolve it
+                # instead of paying a second synchronous all-reduce.
+                params_norm = finalize_params_l2_norm()
             if args.deepspeed:
                 loss_scale = model[0].optimizer.cur_scale
             else: